@@ -8,9 +8,6 @@ from utils import data_files
 # App formatting constants
 NAVBAR_OPTIONS = {"class": "bg-primary", "theme": "dark"}
 
-# Initialize the data folder and log file on app start
-data_files.update_log()
-
 # Main application page UI
 page = ui.page_navbar(
     ui.nav_panel(
@@ -62,26 +59,27 @@ def server(input: object, output: object, session: object) -> None:
     # Central app state store
     store = data_store.DataStore()
     # Reactive value for list of available loaded dataset names
-    datasets = reactive.value([])
+    datasets = data_store.datasets
+    # Initialize the data folder and log file on first session
+    data_files.init_data_folder()
+    # Share one file system watcher across all sessions
+    data_store.start_dataset_watcher()
 
     # Register child modules
     modals.load_modal_server("load_modal", datasets=datasets, on_data_loaded=store.update_data)
     modals.upload_modal_server("upload_modal", datasets=datasets, on_data_loaded=store.update_data)
     sidebar.dashboard_sidebar_server(
-        "sidebar", desc=store.desc, on_surrogates_selected=store.update_surrogates
+        "sidebar",
+        desc=store.desc,
+        embedding=store.embedding,
+        emb_key=store.emb_key,
+        on_surrogates_selected=store.update_surrogates,
     )
     cards.tsne_card_server("tsne", store.desc, store.surrogate_labels)
-    cards.property_card_server("prop", store.data, store.surrogate_labels)
+    cards.property_card_server("prop", store.data, store.num_cols, store.surrogate_labels)
     cards.hist_card_server("hist", store.surr, store.sim)
     cards.report_card_server("report", store.desc, store.surr)
 
-    # File system monitoring
-    @reactive.effect
-    @reactive.file_reader(data_files.LAST_UPDATED)
-    def update_datasets() -> None:
-        """Reactively update available datasets on log file change."""
-        datasets.set(data_files.get_datasets())
-
     # Modal show handlers
     @reactive.effect
     @reactive.event(input.load)
@@ -95,29 +93,18 @@ def server(input: object, output: object, session: object) -> None:
         """Show upload modal on button click."""
         ui.modal_show(modals.upload_modal("upload_modal"))
 
-    # Reactive state queries for conditionals
-    # These must directly access reactive values to establish proper dependencies
-    @reactive.calc
-    def data_ready() -> bool:
-        """Reactive computation of data loaded state."""
-        return not store.desc().empty
-
-    @reactive.calc
-    def surrogates_ready() -> bool:
-        """Reactive computation of surrogate selected state."""
-        return bool(store.surr())
-
     # Conditional UI panel rendering
+    # Panels toggle on these outputs, which read the store's scalar state flags
     @render.ui
     def no_data_alert() -> ui.card:
         """Display an alert in place of content if no data has been loaded."""
-        req(not data_ready())
+        req(not store.has_data())
         return ui.card("No data found. Load data to begin.", fill=False)
 
     @render.ui
     def no_surr_alert() -> ui.card:
         """Display an alert in place of content if no surrogates found."""
-        req(not surrogates_ready())
+        req(not store.has_surr())
         return ui.card("No surrogates found. Run surrogate selection to see results.", fill=False)
 
 
@@ -8,6 +8,7 @@ This module consolidates all card components including:
 - colorable_scatterplot: reusable scatterplot with reactive coloring
 """
 
+from typing import Any
 from webbrowser import open_new_tab
 
 import numpy as np
@@ -16,8 +17,11 @@ import plotly.graph_objects as go
 from faicons import icon_svg
 from htmltools import Tag
 from shiny import module, reactive, render, req, ui
+from shiny.types import SilentException
 from shinywidgets import output_widget, render_plotly, render_widget
 
+from components import notifications
+
 # Universal plotly format parameters
 PLOTLY_TEMPLATE = "plotly_white"
 PLOTLY_COLORS = px.colors.qualitative.Safe
@@ -26,9 +30,65 @@ PLOTLY_COLORS = px.colors.qualitative.Safe
 SEARCH_URL = "https://pubchem.ncbi.nlm.nih.gov/#query={}"
 # Join string for searching multiple IDs (' OR ' for PubChem)
 BATCH_SEARCH_JOIN_STR = " OR "
+# Maximum number of IDs in one batch search, to keep URLs a manageable length
+MAX_BATCH_SEARCH_IDS = 200
+# Maximum number of points drawn in the property plot; surrogates are never
+# dropped, so only non-surrogate points are capped
+MAX_PROPERTY_POINTS = 20000
+# Note shown on a plot drawing fewer points than the data holds
+DOWNSAMPLED_NOTE = (
+    "Showing {n_shown:,} of {n_total:,} points (surrogates never dropped, others sampled)"
+)
 
 
 # %% Shared colorable scatterplot component %%
+def _log_menu_button(type: str, ax: str) -> dict:
+    """Reusable log-scale axis menu button component.
+
+    Args:
+        type: log or linear
+        ax: x or y
+    Returns:
+        dict of button params
+    """
+
+    return {
+        "label": f"{type.capitalize()} {ax.upper()}-axis",
+        "method": "relayout",
+        "args": [{f"{ax.lower()}axis.type": type.lower()}],
+    }
+
+
+def _log_menu(ax: str) -> dict:
+    """Reusable log-scale axis menu component.
+
+    Args:
+        ax: x or y
+    Returns:
+        dict of menu params
+    """
+
+    # Set menu location depending on x or y axis
+    if ax.lower() == "x":
+        loc = {"y": 0, "x": 1.05, "yanchor": "bottom", "xanchor": "left", "direction": "up"}
+    else:
+        loc = {"y": 1.05, "x": 0, "yanchor": "bottom", "xanchor": "left", "direction": "down"}
+
+    # Create menu with buttons and location params
+    return {
+        "showactive": True,
+        "type": "dropdown",
+        "buttons": [_log_menu_button("linear", ax), _log_menu_button("log", ax)],
+    } | loc
+
+
+# Log-scale axis menus, built once since they depend on nothing reactive
+_X_MENU = _log_menu("x")
+_Y_MENU = _log_menu("y")
+_MENUS_WITH_LOG = [_X_MENU, _Y_MENU]
+_MENUS_EMPTY = []
+
+
 @module.ui
 def colorable_scatterplot() -> object:
     return output_widget("plot")
@@ -44,51 +104,48 @@ def colorable_scatterplot_server(
     xcol: object,
     ycol: object,
     showlog: bool,
+    interactive: bool = True,
+    max_points: int | None = None,
     **layout_kwargs,
 ) -> None:
-    """Server logic for reusable colorable scatterplot component."""
-
-    # Reusable button component for log-scale axis menus
-    def _log_menu_button(type: str, ax: str) -> dict:
-        """Reusable log-scale axis menu button component.
-
-        Args:
-            type: log or linear
-            ax: x or y
-        Returns:
-            dict of button params
-        """
+    """Server logic for reusable colorable scatterplot component.
 
-        return {
-            "label": f"{type.capitalize()} {ax.upper()}-axis",
-            "method": "relayout",
-            "args": [{f"{ax.lower()}axis.type": type.lower()}],
-        }
+    Set interactive to False for display-only plots, which skips the
+    click/selection search handlers and the per-trace callback setup.
+    Set max_points to cap the number of points drawn. Labelled (surrogate)
+    points are never dropped, so the cap only limits the others: a fixed
+    random sample of them fills whatever room the surrogates leave, and
+    none are drawn if the surrogates alone exceed max_points. A note on
+    the plot gives the number of points shown.
+    """
 
-    def _log_menu(ax: str) -> dict:
-        """Reusable log-scale axis menu component.
+    def _downsample(df: object, lab: list | None) -> tuple:
+        """Sample non-surrogate points down to the room left by max_points.
 
         Args:
-            ax: x or y
+            df: data to plot
+            lab: point labels, or None
         Returns:
-            dict of menu params
+            tuple of (possibly) downsampled data and labels
         """
 
-        # Set menu location depending on x or y axis
-        if ax.lower() == "x":
-            loc = {"y": 0, "x": 1.05, "yanchor": "bottom", "xanchor": "left", "direction": "up"}
-        else:
-            loc = {"y": 1.05, "x": 0, "yanchor": "bottom", "xanchor": "left", "direction": "down"}
+        if max_points is None or df.shape[0] <= max_points:
+            return df, lab
 
-        # Create menu with buttons and location params
-        return {
-            "showactive": True,
-            "type": "dropdown",
-            "buttons": [_log_menu_button("linear", ax), _log_menu_button("log", ax)],
-        } | loc
+        # Always keep surrogate points, fill the remainder with a sample of
+        # the others (fixed seed so the same points are drawn every render)
+        lab_arr = np.asarray(lab) if lab is not None else np.full(df.shape[0], "none")
+        keep = np.flatnonzero(lab_arr != "none")
+        rest = np.flatnonzero(lab_arr == "none")
+        n_rest = max(max_points - keep.size, 0)
+        rest = np.random.default_rng(0).choice(rest, min(n_rest, rest.size), replace=False)
+        rows = np.sort(np.concatenate([keep, rest]))
+
+        return df.iloc[rows], (lab_arr[rows].tolist() if lab is not None else None)
 
     def _get_event_ids(trace: dict, points: object) -> list:
-        return trace["hovertext"][points.point_inds]
+        # Single gather on the hover text array, then convert to str list
+        return np.asarray(trace["hovertext"])[points.point_inds].tolist()
 
     def on_click(trace: dict, points: object, state: object) -> None:
         """Open search in a new tab when a data point is clicked."""
@@ -100,36 +157,135 @@ def colorable_scatterplot_server(
         """Open batch search in a new tab when data points are selected."""
         if len(points.point_inds) > 0:
             ids = _get_event_ids(trace, points)
+            if len(ids) > MAX_BATCH_SEARCH_IDS:
+                # Keep the search URL within browser length limits
+                notifications.search_truncated_notification(MAX_BATCH_SEARCH_IDS, len(ids))
+                ids = ids[:MAX_BATCH_SEARCH_IDS]
             open_new_tab(SEARCH_URL.format(BATCH_SEARCH_JOIN_STR.join(ids)))
 
+    # What the rendered figure shows, so axis changes can be patched into it:
+    # the rendered value, its axes, the drawn data and each trace's rows
+    shown: dict[str, Any] = {"value": None, "axes": None, "data": None, "rows": []}
+
+    def _hovertemplate(name: str, x: str, y: str) -> str:
+        # Hover text from the current axis names, used at render and patch time
+        group = f"color={name}<br>" if name else ""
+        return f"<b>%{{hovertext}}</b><br><br>{group}{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>"
+
+    def _valid_axes(df: object, axes: tuple) -> bool:
+        # Both axes chosen and present in the data (inputs lag new datasets)
+        return all(axes) and all(ax in df.columns for ax in axes)
+
+    def _isolated_axes() -> tuple:
+        # Current axes without taking a dependency, or None while unset
+        with reactive.isolate():
+            try:
+                return xcol(), ycol()
+            except SilentException:
+                return None, None
+
     @render_widget
     def plot() -> object:
-        """Build the main figure widget component for the plot."""
-        req(xcol() and ycol() and not data().empty)
+        """Build the main figure widget component for the plot.
+
+        Rebuilt only when data or labels change; axis changes are patched
+        into the rendered widget by patch_axes.
+        """
+        shown.update(value=None)
+        df, lab = data(), labels()
+        req(not df.empty)
+
+        # Axes are read without a dependency once valid, taking one only
+        # while waiting for valid axes to be chosen
+        axes = _isolated_axes()
+        if not _valid_axes(df, axes):
+            axes = (xcol(), ycol())
+        req(_valid_axes(df, axes))
 
         # Show or hide log-scale axis menus
-        menus = [_log_menu("x"), _log_menu("y")] if showlog else []
+        menus = _MENUS_WITH_LOG if showlog else _MENUS_EMPTY
 
         # Build the base figure
+        n_total = df.shape[0]
+        df, lab = _downsample(df, lab)
         fig = px.scatter(
-            data(),
-            x=xcol(),
-            y=ycol(),
-            color=labels(),
+            df,
+            x=axes[0],
+            y=axes[1],
+            # No labels (None) until surrogates are selected: single color
+            color=lab,
             # Required for point indexing
             # Display only, not currently functional
-            hover_name=data().index,
+            hover_name=df.index,
             template=PLOTLY_TEMPLATE,
             color_discrete_sequence=PLOTLY_COLORS,
+            # WebGL (Scattergl) traces stay responsive for large datasets
+            render_mode="webgl",
         ).update_layout(updatemenus=menus, **layout_kwargs)
 
-        # Set up the figure widget to register click handler
-        widg = go.FigureWidget(fig.data, fig.layout)
-        for tr in widg.data:
-            tr.on_click(on_click)
-            tr.on_selection(on_selection)
-
-        return widg
+        # Say when not every point is drawn (and so not every point searchable)
+        if df.shape[0] < n_total:
+            fig.add_annotation(
+                text=DOWNSAMPLED_NOTE.format(n_shown=df.shape[0], n_total=n_total),
+                xref="paper",
+                yref="paper",
+                x=1,
+                y=1,
+                xanchor="right",
+                yanchor="bottom",
+                showarrow=False,
+            )
+        fig.for_each_trace(lambda tr: tr.update(hovertemplate=_hovertemplate(tr.name, *axes)))
+
+        # One trace per label (in trace name), or a single trace of all rows
+        lab_arr = np.asarray(lab) if lab is not None else None
+        rows = [
+            slice(None) if lab is None else np.flatnonzero(lab_arr == tr.name) for tr in fig.data
+        ]
+
+        value = fig
+        if interactive:
+            # Set up the figure widget to register click handler
+            # Handlers are bound per render, since widgets are not reused
+            value = go.FigureWidget(fig.data, fig.layout)
+            # Registering handlers is Python-side only, nothing is sent
+            for tr in value.data:
+                tr.on_click(on_click)
+                tr.on_selection(on_selection)
+
+        shown.update(value=value, axes=axes, data=df, rows=rows)
+        return value
+
+    @reactive.effect
+    def patch_axes() -> None:
+        """Send only the new coordinates to the rendered widget on axis change."""
+        axes = (xcol(), ycol())
+        # Raises a silent exception until the first render, so this effect
+        # waits for it; None is only returned outside a reactive context
+        widg = plot.widget
+        # Skip until a render succeeds, and when it already shows these axes
+        # (the None check only narrows the type for the checker)
+        if widg is None or plot.value is not shown["value"] or axes == shown["axes"]:
+            return
+        df = shown["data"]
+        if not _valid_axes(df, axes):
+            return
+
+        x, y = axes
+        xs, ys = df[x].to_numpy(), df[y].to_numpy()
+        with widg.batch_update():
+            for tr, rows in zip(widg.data, shown["rows"], strict=True):
+                tr.x, tr.y = xs[rows], ys[rows]
+                tr.hovertemplate = _hovertemplate(tr.name, x, y)
+            widg.layout.xaxis.title.text = x
+            widg.layout.yaxis.title.text = y
+            # Drop zoom/pan ranges and log scales relayed from the browser,
+            # which belong to the previous columns, as a rebuild would
+            for axis in (widg.layout.xaxis, widg.layout.yaxis):
+                axis.update(autorange=True, type="linear")
+            for menu in widg.layout.updatemenus:
+                menu.active = 0  # Linear button
+        shown.update(axes=axes)
 
 
 # %% Text report card %%
@@ -150,12 +306,12 @@ def report_card_server(
     @render.text
     def report() -> str:
         req(surr())
+        # Take index values once as an array, then gather IDs per strategy
+        ids = desc().index.to_numpy()
         return "\n====================\n".join(
-            [
-                f"{strat.upper()}\nLARD: {float(res[1]):.3g}\n"
-                f"Surrogates Selected:\n{chr(10).join(desc().index[res[0]])}"
-                for strat, res in surr().items()
-            ]
+            f"{strat.upper()}\nLARD: {float(res[1]):.3g}\n"
+            f"Surrogates Selected:\n{chr(10).join(ids[res[0]].tolist())}"
+            for strat, res in surr().items()
         )
 
 
@@ -192,35 +348,66 @@ def hist_card_server(
     @render_plotly
     def hist() -> object:
         req("scores" in sim())
-        fig = px.histogram(
-            x=sim()["scores"],
-            color=sim()["ns"],
+        scores, ns = sim()["scores"], sim()["ns"]
+
+        # Bin on the server with shared edges, so only bin counts are sent
+        # to the browser rather than every simulated score
+        edges = np.histogram_bin_edges(scores, bins=100)
+        centers, widths = (edges[:-1] + edges[1:]) / 2, np.diff(edges)
+        colors = px.colors.sequential.Greys_r
+        fig = go.Figure(
+            [
+                go.Bar(
+                    x=centers,
+                    y=np.histogram(scores[ns == n], bins=edges)[0],
+                    width=widths,
+                    name=str(n),
+                    marker_color=colors[i % len(colors)],
+                    opacity=0.6,
+                )
+                for i, n in enumerate(np.unique(ns))
+            ]
+        ).update_layout(
             template=PLOTLY_TEMPLATE,
-            color_discrete_sequence=px.colors.sequential.Greys_r,
-            nbins=100,
-            opacity=0.6,
             barmode="overlay",
-        ).update_layout(
+            bargap=0,
             xaxis_title="Leveraged Averaged Representative Distance (LARD)",
             yaxis_title="Count",
             legend_title="Surrogate Set Size",
         )
 
+        # Mark each strategy's score with a dashed line, labels alternating
+        # top and bottom; all added in one layout update rather than per line
         sort_surr = sorted(surr().items(), key=lambda x: x[1][1])
-        for i, (strat, results) in enumerate(sort_surr):
-            fig.add_vline(
-                x=results[1],
-                line_width=2,
-                line_dash="dash",
-                line_color="black",
-                annotation_text=f"{strat} (N={len(results[0])})",
-                annotation_position="bottom right" if i % 2 else "top right",
-                annotation_bgcolor="rgba(255, 255, 255, 0.75)",
-                annotation_xshift=2,
-                opacity=1,
-            )
-
-        return fig
+        shapes = [
+            {
+                "type": "line",
+                "x0": results[1],
+                "x1": results[1],
+                "y0": 0,
+                "y1": 1,
+                "yref": "paper",
+                "line": {"width": 2, "dash": "dash", "color": "black"},
+                "opacity": 1,
+            }
+            for _, results in sort_surr
+        ]
+        annotations = [
+            {
+                "x": results[1],
+                "y": 0 if i % 2 else 1,
+                "yref": "paper",
+                "xanchor": "left",
+                "yanchor": "bottom" if i % 2 else "top",
+                "xshift": 2,
+                "showarrow": False,
+                "text": f"{strat} (N={len(results[0])})",
+                "bgcolor": "rgba(255, 255, 255, 0.75)",
+            }
+            for i, (strat, results) in enumerate(sort_surr)
+        ]
+
+        return fig.update_layout(shapes=shapes, annotations=annotations)
 
 
 # %% t-SNE scatterplot card %%
@@ -249,6 +436,7 @@ def tsne_card_server(
         _make_constant_reactive("TSNE1"),
         _make_constant_reactive("TSNE2"),
         showlog=False,
+        interactive=False,
         legend_title="Surrogate Set",
     )
 
@@ -268,15 +456,15 @@ def property_card() -> ui.card:
 
 @module.server
 def property_card_server(
-    input: object, output: object, session: object, data: object, labels: object
+    input: object,
+    output: object,
+    session: object,
+    data: object,
+    num_cols: object,
+    labels: object,
 ) -> None:
     """Server logic for property comparison card."""
 
-    @reactive.calc
-    def num_cols() -> list:
-        """Reactive calculation of numerical columns in input data."""
-        return data().select_dtypes(include=np.number).columns.tolist()
-
     def _num_cols_select(ax: str) -> Tag:
         return ui.input_select(
             ax.lower() + "col", ax.upper() + "-axis Property", choices=num_cols()
@@ -291,5 +479,12 @@ def property_card_server(
         return _num_cols_select("y")
 
     colorable_scatterplot_server(
-        "plot", data, labels, input.xcol, input.ycol, showlog=True, legend_title="Surrogate Set"
+        "plot",
+        data,
+        labels,
+        input.xcol,
+        input.ycol,
+        showlog=True,
+        max_points=MAX_PROPERTY_POINTS,
+        legend_title="Surrogate Set",
     )
@@ -5,9 +5,68 @@ reactively and provides a clean API for state mutations. This encapsulation
 simplifies testing, debugging, and future enhancements.
 """
 
+import asyncio
+import functools
+import hashlib
+
+import numpy as np
 import pandas as pd
 from shiny import reactive
 
+from utils import data_files, ionization_efficiency
+
+# Process-wide list of available dataset names, shared by all sessions
+datasets = reactive.value([])
+# Single background task watching the data folder for all sessions
+_watcher: asyncio.Task | None = None
+
+
+async def _watch_datasets() -> None:
+    """Broadcast data folder changes to all sessions via datasets."""
+    async for _ in data_files.watch_datasets():
+        # Lock the reactive graph to set and flush from outside a session
+        async with reactive.lock():
+            # An unchanged (cached, identical) listing does not invalidate
+            datasets.set(data_files.get_datasets())
+            await reactive.flush()
+
+
+def start_dataset_watcher() -> None:
+    """Start the shared data folder watcher if it is not already running."""
+    global _watcher
+    if _watcher is None or _watcher.done():
+        datasets.set(data_files.get_datasets())
+        _watcher = asyncio.create_task(_watch_datasets())
+
+
+@functools.lru_cache(maxsize=4)
+def _surrogate_labels(n: int, surr_key: tuple) -> list:
+    """Memoized label computation on a hashable surrogate selection key.
+
+    Args:
+        n: number of data points
+        surr_key: sorted tuple of (strategy, index bytes) pairs
+    Returns:
+        list of label strings, one per data point (shared, do not mutate)
+    """
+    # Strategy names are already sorted in the key
+    strats = [strat for strat, _ in surr_key]
+
+    # Label for every combination of strategies, indexed by membership bitmask
+    combos = np.array(
+        [
+            "&".join(s for j, s in enumerate(strats) if m >> j & 1) or "none"
+            for m in range(1 << len(strats))
+        ]
+    )
+
+    # Set each strategy's bit on the points it selected
+    bits = np.zeros(n, dtype=np.int64)
+    for j, (_, idx_bytes) in enumerate(surr_key):
+        bits[np.frombuffer(idx_bytes, dtype=np.int64)] |= 1 << j
+
+    return combos[bits].tolist()
+
 
 class DataStore:
     """Centralized store for all data and surrogate state.
@@ -19,12 +78,20 @@ class DataStore:
     def __init__(self) -> None:
         """Initialize empty store with reactive values."""
         self.data = reactive.value(pd.DataFrame())
+        self.num_cols = reactive.value([])
         self.desc = reactive.value(pd.DataFrame())
+        self.embedding = reactive.value(np.empty((0, 0)))
+        self.emb_key = reactive.value(b"")
         self.surr = reactive.value({})
         self.sim = reactive.value({})
+        # Scalar state flags, cheaper for conditionals than inspecting values
+        self.has_data = reactive.value(False)
+        self.has_surr = reactive.value(False)
+        # Share a single cached labels node between all cards of a session
+        self.surrogate_labels = reactive.calc(self._compute_surrogate_labels)
 
     # %% State mutation methods %%
-    def update_data(self, data_: pd.DataFrame, desc_: pd.DataFrame) -> None:
+    def update_data(self, data_: pd.DataFrame, desc_: pd.DataFrame, meta_: dict) -> None:
         """Load data and descriptors atomically.
 
         Trims data to match desc index and clears derived state
@@ -33,28 +100,59 @@ class DataStore:
         Args:
             data_: DataFrame with original data
             desc_: DataFrame with calculated descriptors
+            meta_: dataset metadata saved with the data (see data_files.build_meta)
         """
-        # Trim data to match desc index
-        data_trimmed = data_[data_.index.isin(desc_.index)]
-
-        # Atomic update
-        self.desc.set(desc_)
-        self.data.set(data_trimmed)
-        self.surr.set({})  # Clear derived state
-        self.sim.set({})
+        # Trim data to match desc index, which is always a subset of data index
+        if data_.index.is_unique:
+            # Direct hash lookup per key, no boolean mask over all rows
+            data_trimmed = data_.loc[desc_.index]
+        else:
+            # Duplicate IDs would be repeated by .loc, so fall back to a mask
+            data_trimmed = data_[data_.index.isin(desc_.index)]
+        # Extract a dense C-contiguous embedding once for selection hot loops
+        emb = np.ascontiguousarray(
+            desc_[ionization_efficiency.IONIZATION_EFFICIENCY_EMBEDDING].to_numpy(),
+            dtype=np.float64,
+        )
+        # Fingerprint the embedding to key cached simulation results
+        emb_key = hashlib.blake2b(emb.tobytes(), digest_size=16).digest()
+
+        # Clear derived state only if set, so its dependents are not invalidated
+        # for nothing (reactive.Value only skips sets of the identical object)
+        with reactive.isolate():
+            if self.surr():
+                self.surr.set({})
+                self.has_surr.set(False)
+            if self.sim():
+                self.sim.set({})
+
+        # Atomic update, with shallow copies so cached loads stay untouched
+        # Invalidations are batched until the next flush; desc is set last
+        # since most dependents read it
+        self.embedding.set(emb)
+        self.emb_key.set(emb_key)
+        self.data.set(data_trimmed.copy(deep=False))
+        # Numeric columns come from persisted metadata, no dtype scan per load
+        self.num_cols.set(meta_["num_cols"])
+        self.desc.set(desc_.copy(deep=False))
+        self.has_data.set(not desc_.empty)
 
     def update_surrogates(self, surr_: dict, sim_: dict) -> None:
         """Update surrogate selection results.
 
+        Strategies are stored sorted by name, once, so that readers such as
+        the labels and report can iterate them in order without sorting.
+
         Args:
             surr_: dict of strategy -> (indices array, LARD score)
             sim_: dict of simulation results for comparison
         """
-        self.surr.set(surr_)
+        self.surr.set(dict(sorted(surr_.items())))
         self.sim.set(sim_)
+        self.has_surr.set(bool(surr_))
 
     # %% Computed values %%
-    def surrogate_labels(self) -> list:
+    def _compute_surrogate_labels(self) -> list | None:
         """Reactively compute surrogate labels for all data points.
 
         For each data point, creates a label string indicating which
@@ -62,15 +160,17 @@ class DataStore:
         visualization coloring.
 
         Returns:
-            list of label strings, one per data point
+            list of label strings, one per data point, or None if no
+            surrogates are selected (plots then use a single color)
         """
-        # Initialize empty labels for each point
-        labels = {i: [] for i in range(self.desc().shape[0])}
-
-        # Collect strategy names for each point
-        for strat, (idx, _) in self.surr().items():
-            for i in idx:
-                labels[i].append(strat)
-
-        # Convert to sorted comma-separated strings
-        return ["&".join(sorted(x)) if x else "none" for x in labels.values()]
+        # Skip labelling entirely until there is something to label
+        if not self.surr():
+            return None
+
+        # Canonical content key (strategies already sorted by update_surrogates),
+        # so identical selections hit the cache
+        key = tuple(
+            (strat, np.ascontiguousarray(idx, dtype=np.int64).tobytes())
+            for strat, (idx, _) in self.surr().items()
+        )
+        return _surrogate_labels(self.desc().shape[0], key)
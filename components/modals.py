@@ -5,6 +5,8 @@ This module consolidates all modal components including:
 - upload_modal: Upload and process new dataset
 """
 
+import csv
+import itertools
 import re
 from collections.abc import Callable
 from enum import StrEnum
@@ -17,10 +19,15 @@ from shiny import module, reactive, render, ui
 from components import notifications
 from utils import data_files, ionization_efficiency
 
+# Dataset name length bounds (inclusive), checked before the pattern match
+NAME_LENGTH = (2, 32)
 # Regular expression for dataset name character validation
-NAME_PATTERN = re.compile("[A-Za-z0-9_\\- ]{2,32}")
+NAME_PATTERN = re.compile("[A-Za-z0-9_\\- ]+")
 
-type OnDataLoadedCallback = Callable[[pd.DataFrame, pd.DataFrame], None]
+# Number of leading lines used to detect the delimiter of .txt uploads
+SNIFF_LINES = 5
+
+type OnDataLoadedCallback = Callable[[pd.DataFrame, pd.DataFrame, dict], None]
 
 
 class FileExtensions(StrEnum):
@@ -64,9 +71,10 @@ def load_modal_server(
             notifications.error_notification(notifications.ValidationErrors.NO_NAME)
             return  # Stop processing, but leave the modal open
 
-        # Otherwise, read data files and update global app data
-        data, desc = data_files.load_data(input.name())
-        on_data_loaded(data, desc)
+        # Otherwise, read data files (only the numeric data columns are used)
+        # and update global app data
+        data, desc, meta = data_files.load_data(input.name(), numeric_only=True)
+        on_data_loaded(data, desc, meta)
 
         # Show success notification
         notifications.load_success_notification(data.shape[0], desc.shape[0])
@@ -113,6 +121,8 @@ def upload_modal_server(
     # Reactive value to hold temporary data loaded from the file input,
     # used to populate selectors before processing & persisting the data
     temp = reactive.value(pd.DataFrame())
+    # Column choices last sent to the select inputs
+    sent_choices: reactive.Value[tuple[str, ...]] = reactive.value(())
 
     def _clear_temp() -> None:
         """Reset temp reactive to an empty data frame."""
@@ -133,17 +143,58 @@ def upload_modal_server(
         df = pd.DataFrame()
         match ext:
             case FileExtensions.CSV:
-                df = pd.read_csv(content)
+                df = _read_delimited(content, ",")
             case FileExtensions.XLS | FileExtensions.XLSX:
                 df = pd.read_excel(content)
             case FileExtensions.TSV:
-                df = pd.read_table(content, sep="\t")
+                df = _read_delimited(content, "\t")
             case FileExtensions.TXT:
                 # Infer delimiter from unspecified tabular text file
-                df = pd.read_table(content, sep=None, engine="python")
+                df = _read_delimited(content, _sniff_delimiter(content))
 
         return df
 
+    def _read_delimited(content: str, sep: str) -> pd.DataFrame:
+        """Read a delimited text file, preferring the multithreaded pyarrow parser.
+
+        Args:
+            content: path to the uploaded file
+            sep: column delimiter
+        Returns:
+            df of parsed file data
+        """
+
+        try:
+            df = pd.read_csv(content, sep=sep, engine="pyarrow")
+        except ValueError:
+            # pyarrow rejects some malformed rows the C engine can handle
+            return pd.read_csv(content, sep=sep)
+
+        # pyarrow keeps blank and repeated header names as they are, while the
+        # C engine renames them ("Unnamed: 3", "v.1"), so defer to it then
+        if df.columns.has_duplicates or not all(isinstance(c, str) and c for c in df.columns):
+            return pd.read_csv(content, sep=sep)
+
+        return df
+
+    def _sniff_delimiter(content: str) -> str:
+        """Detect the delimiter of a tabular text file from its first lines.
+
+        Args:
+            content: path to the uploaded file
+        Returns:
+            detected column delimiter
+        """
+
+        with open(content, newline="", encoding="utf-8") as f:
+            sample = "".join(itertools.islice(f, SNIFF_LINES))
+        return csv.Sniffer().sniff(sample).delimiter
+
+    @reactive.calc
+    def lowered_datasets() -> set:
+        """Lowercased existing dataset names, rebuilt only when they change."""
+        return {x.lower() for x in datasets()}
+
     def _validate_name(name: str) -> list:
         """Validate user input dataset name.
 
@@ -161,10 +212,10 @@ def upload_modal_server(
         if not name:
             # Validate name was provided
             errors.append(notifications.ValidationErrors.NO_NAME)
-        elif name.lower() in [x.lower() for x in datasets()]:
+        elif name.lower() in lowered_datasets():
             # Validate name not duplicate of existing (case insensitive)
             errors.append(notifications.ValidationErrors.NAME_DUP)
-        elif not re.fullmatch(NAME_PATTERN, name):
+        elif not NAME_LENGTH[0] <= len(name) <= NAME_LENGTH[1] or not NAME_PATTERN.fullmatch(name):
             # Validate name permissible
             errors.append(notifications.ValidationErrors.NAME_INVALID)
 
@@ -209,12 +260,10 @@ def upload_modal_server(
             processed data df
         """
 
-        # Set index, drop user ignored columns, and return a deep copy of data
-        return (
-            data.copy(deep=True)
-            .set_index(id_col)
-            .drop(columns=[col for col in ignore_cols if not col == qrs_col])
-        )
+        # Keep the ID, SMILES and non-ignored columns, then set the index
+        # No deep copy needed, since copy-on-write leaves the uploaded df intact
+        keep = [c for c in data.columns if c in (id_col, qrs_col) or c not in ignore_cols]
+        return data_files.with_string_index(data.loc[:, keep].set_index(id_col))
 
     def _clear_and_close() -> None:
         """Clear entered data and close the modal."""
@@ -249,10 +298,16 @@ def upload_modal_server(
     def update_select() -> None:
         """Update select inputs with columns from temp when it changes."""
 
-        # Get available columns from temp data (or empty list if temp is empty)
-        choices = [] if temp().empty else list(temp().columns)
+        # Get available columns from temp data (or empty tuple if temp is empty)
+        choices = () if temp().empty else tuple(temp().columns)
+
+        # Skip resending identical choices, e.g. on re-upload of the same layout
+        if choices == sent_choices():
+            return
+        sent_choices.set(choices)
 
         # Update select inputs with available columns
+        choices = list(choices)
         ui.update_select("id_col", choices=choices)
         ui.update_select("qrs_col", choices=choices)
         ui.update_selectize("ignore_cols", choices=choices)
@@ -278,11 +333,11 @@ def upload_modal_server(
         data = _process_data(temp(), id_col, qrs_col, input.ignore_cols())
         desc = ionization_efficiency.calculate_ionization_efficiency(data[qrs_col], data.index)
 
-        # Save data frames as parquet files
-        data_files.save_data(name, data, desc)
+        # Save data frames as parquet files, plus derived metadata
+        meta = data_files.save_data(name, data, desc)
 
         # Use callback to update global app data
-        on_data_loaded(data, desc)
+        on_data_loaded(data, desc, meta)
 
         # Show success notification, clear temp data, and close modal
         notifications.load_success_notification(data.shape[0], desc.shape[0])
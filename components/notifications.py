@@ -7,6 +7,7 @@ from shiny.ui import notification_show
 DEFAULT_DURATION = 3
 DEFAULT_TYPE = "message"
 LOAD_SUCCESS_MESSAGE = "Successfully loaded {n_records} records ({n_structs} structurable)."
+SEARCH_TRUNCATED_MESSAGE = "Searching the first {n_sent} of {n_selected} selected points."
 
 
 class ValidationErrors(StrEnum):
@@ -63,6 +64,19 @@ def load_success_notification(n_records: int, n_structs: int) -> None:
     _notification(LOAD_SUCCESS_MESSAGE.format(n_records=n_records, n_structs=n_structs))
 
 
+def search_truncated_notification(n_sent: int, n_selected: int) -> None:
+    """Display a notification when a batch search is limited to fewer points.
+
+    Args:
+        n_sent: number of selected points included in the search
+        n_selected: total number of selected points
+    """
+
+    _notification(
+        SEARCH_TRUNCATED_MESSAGE.format(n_sent=n_sent, n_selected=n_selected), type="warning"
+    )
+
+
 def error_notification(key: ValidationErrors) -> None:
     """Display an error notification based on key.
 
@@ -5,14 +5,17 @@ automated surrogate selection or to manually select surrogates for
 comparison.
 """
 
+import asyncio
+import threading
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 from faicons import icon_svg
 from shiny import module, reactive, ui
 
 from components import notifications
-from utils import ionization_efficiency, surrogate_selection
+from utils import surrogate_selection
 
 # Surrogate selection defaults
 DEFAULT_STRATS = [surrogate_selection.SurrogateSelection.Strategy.HIERARCHICAL]
@@ -20,6 +23,30 @@ DEFAULT_N = 0.2
 # Random simulated surrogate selection comparison parameters
 RANDOM_REPS = 100
 RANDOM_NS = [0.01, 0.1, 0.2, 0.5]
+# Number of parallel chunks to split each set size's repetitions into
+RANDOM_CHUNKS = 4
+# Maximum number of cached (embedding, n) random simulation results
+SIM_CACHE_SIZE = 64
+# Maximum number of cached selector instances (one per embedding)
+SELECTOR_CACHE_SIZE = 4
+
+# Shared worker pool for random simulation (BLAS distances release the GIL)
+# Threads rather than processes avoid paging space issues in Shiny deployment,
+# and the worker count bounds how many distance temporaries exist at once
+_simulation_pool = ThreadPoolExecutor(max_workers=RANDOM_CHUNKS)
+# Random simulation scores shared across sessions, keyed on (emb key, n, reps)
+_simulation_cache = {}
+# Selector instances shared across sessions and clicks, keyed on emb key
+_selector_cache = {}
+# Guards the caches, since selections from all sessions run in worker threads
+_cache_lock = threading.Lock()
+
+
+def _evict_oldest(cache: dict, size: int) -> None:
+    # Evict the oldest entries (dicts keep insertion order) beyond the limit
+    while len(cache) > size:
+        del cache[next(iter(cache))]
+
 
 type OnSurrogatesSelectedCallback = Callable[[dict, dict], None]
 
@@ -73,12 +100,18 @@ def dashboard_sidebar_server(
     output: object,
     session: object,
     desc: reactive.Value,
+    embedding: reactive.Value,
+    emb_key: reactive.Value,
     on_surrogates_selected: OnSurrogatesSelectedCallback,
 ) -> None:
     @reactive.calc
     def user_idx() -> np.ndarray:
         """Reactively process user entered surrogate IDs to list of indices."""
-        return np.where(np.isin(desc().index, input.user_ids().splitlines()))[0]
+        ids = [s for s in input.user_ids().splitlines() if s]
+        # Hash lookups against the index engine, which pandas builds only once
+        pos = desc().index.get_indexer_for(ids)
+        # Drop unmatched IDs and return sorted unique positions
+        return np.unique(pos[pos >= 0])
 
     def _validate_auto(n: float, strats: list) -> list:
         """Validate inputs to automated surrogate selection.
@@ -138,47 +171,110 @@ def dashboard_sidebar_server(
 
         return {"user": (user_idx, selector.score(user_idx))}
 
-    def _process_conditional(
-        switch: bool,
-        selector: object,
-        _validate_fn: Callable,
-        _process_fn: Callable,
-        *args,
-    ) -> dict:
-        """Chain validation, error display, and processing of selection.
+    def _validate_conditional(switch: bool, _validate_fn: Callable, *args) -> bool:
+        """Chain validation and error display of a selection.
 
         Args:
             switch: condition to check whether selection should be processed
-            selector: SurrogateSelection instance
             _validate_fn: input validation function
-            _process_fn: input processing function
-            *args: arguments to validation and processing functions
+            *args: arguments to validation function
         Returns:
-            dict of surrogate selections and score for each strategy
+            whether the selection should be processed
         """
 
-        surr = {}
-        if switch:
-            errors = _validate_fn(*args)
-            if errors:
-                for err in errors:
-                    notifications.error_notification(err)
-            else:
-                surr = _process_fn(selector, *args)
-
-        return surr
-
-    def _simulate_random(selector: object, ns: list) -> dict:
-        scores = []
-        for n in ns:
-            scores.extend(
-                [
-                    selector.select(n, surrogate_selection.SurrogateSelection.Strategy.RANDOM)[1]
-                    for _ in range(RANDOM_REPS)
-                ]
-            )
+        if not switch:
+            return False
+
+        errors = _validate_fn(*args)
+        for err in errors:
+            notifications.error_notification(err)
+
+        return not errors
+
+    def _simulate_random(selector: object, key: bytes, ns: list) -> dict:
+        # Take cached set sizes for this embedding now, since other sessions
+        # may evict them while the missing sizes are simulated
+        with _cache_lock:
+            cached = {
+                n: _simulation_cache[key, n, RANDOM_REPS]
+                for n in ns
+                if (key, n, RANDOM_REPS) in _simulation_cache
+            }
+        novel = [n for n in ns if n not in cached]
+
+        # Split repetitions for each n into chunks with independent seeds
+        reps = [len(c) for c in np.array_split(np.arange(RANDOM_REPS), RANDOM_CHUNKS)]
+        seeds = iter(np.random.SeedSequence().spawn(len(novel) * len(reps)))
+        futures = {
+            n: [_simulation_pool.submit(selector.simulate_random, n, r, next(seeds)) for r in reps]
+            for n in novel
+        }
+        results = {n: np.concatenate([f.result() for f in fs]) for n, fs in futures.items()}
+
+        with _cache_lock:
+            _simulation_cache.update({(key, n, RANDOM_REPS): r for n, r in results.items()})
+            _evict_oldest(_simulation_cache, SIM_CACHE_SIZE)
+
+        results |= cached
+        scores = np.concatenate([results[n] for n in ns])
         return {"scores": scores, "ns": np.repeat(ns, RANDOM_REPS)}
 
+    def _get_selector(emb: np.ndarray, key: bytes) -> object:
+        # Reuse the selector (and its leverages) while the embedding is unchanged
+        with _cache_lock:
+            selector = _selector_cache.get(key)
+        if selector is None:
+            selector = surrogate_selection.SurrogateSelection(emb)
+            with _cache_lock:
+                selector = _selector_cache.setdefault(key, selector)
+                _evict_oldest(_selector_cache, SELECTOR_CACHE_SIZE)
+        return selector
+
+    def _select(
+        emb: np.ndarray, key: bytes, auto: tuple | None, user: np.ndarray | None
+    ) -> tuple[dict, dict]:
+        """Perform validated surrogate selection and random simulation.
+
+        Args:
+            emb: ionization efficiency descriptor embedding matrix
+            key: fingerprint of the descriptor embedding
+            auto: user input number of surrogates and strategies, or None
+            user: indices of user selected surrogates, or None
+        Returns:
+            tuple of surrogate selections and random simulation results
+        """
+
+        # Get cached or new selector instance
+        selector = _get_selector(emb, key)
+
+        # Process automated and/or user surrogate selection
+        surr = {}
+        if auto is not None:
+            surr |= _process_auto(selector, *auto)
+        if user is not None:
+            surr |= _process_user(selector, user)
+
+        # Get effective size of fractional n values and ensure uniqueness
+        # Build a new set so the RANDOM_NS constant is never mutated
+        n_total = emb.shape[0]
+        effective = {n if n >= 1 else round(n_total * n) for n in RANDOM_NS}
+        if user is not None:
+            effective.add(len(user))
+        if auto is not None:
+            n_auto = auto[0]
+            effective.add(n_auto if n_auto >= 1 else round(n_total * n_auto))
+
+        # Execute random simulation
+        return surr, _simulate_random(selector, key, sorted(effective))
+
+    @ui.bind_task_button(button_id="select")
+    @reactive.extended_task
+    async def select_task(
+        emb: np.ndarray, key: bytes, auto: tuple | None, user: np.ndarray | None
+    ) -> tuple[dict, dict]:
+        """Run selection in a worker thread to keep the event loop responsive."""
+        return await asyncio.to_thread(_select, emb, key, auto, user)
+
     @reactive.effect
     @reactive.event(input.select)
     def select() -> None:
@@ -189,50 +285,30 @@ def dashboard_sidebar_server(
             notifications.error_notification(notifications.ValidationErrors.NO_DATA)
             return  # Short-circuit with error notification if not
 
-        # Initialize selector instance
-        selector = surrogate_selection.SurrogateSelection(
-            desc()[ionization_efficiency.IONIZATION_EFFICIENCY_EMBEDDING]
-        )
-        # Process automated and/or user surrogate selection
-        surr = {
-            **_process_conditional(
-                include_auto := input.include_auto(),
-                selector,
-                _validate_auto,
-                _process_auto,
-                n_auto := input.n(),
-                input.strats(),
-            ),  # auto selections
-            **_process_conditional(
-                include_user := input.include_user(),
-                selector,
-                _validate_user,
-                _process_user,
-                user_idx(),
-            ),  # user selections
-        }
-
-        # Proceed if selection succeeded
-        if surr:
-            ns = RANDOM_NS
-            if include_user and (n_user := len(user_idx())) > 0:
-                ns.append(n_user)
-            if include_auto:
-                ns.append(n_auto)
+        # Validate automated and/or user surrogate selection inputs
+        auto = user = None
+        if _validate_conditional(
+            input.include_auto(), _validate_auto, n := input.n(), strats := input.strats()
+        ):
+            auto = (n, strats)
+        if _validate_conditional(input.include_user(), _validate_user, user_idx()):
+            user = user_idx()
 
-            # Get effective size of fractional n values and ensure uniqueness
-            unique_int_ns = [n if n >= 1 else round(desc().shape[0] * n) for n in list(set(ns))]
+        # Proceed if any selection is valid
+        if auto is not None or user is not None:
+            select_task(embedding(), emb_key(), auto, user)
 
-            # Execute random simulation
-            sim = _simulate_random(selector, sorted(unique_int_ns))
-
-            # Update global surrogate selection data using callback
-            on_surrogates_selected(surr, sim)
+    @reactive.effect
+    def selected() -> None:
+        """Update global surrogate selection data when selection completes."""
+        on_surrogates_selected(*select_task.result())
 
     @reactive.effect
     @reactive.event(desc)
     def clear() -> None:
         """Clear surrogate selection inputs when dataset changes."""
+        # Discard any selection still running against the previous dataset
+        select_task.cancel()
         ui.update_switch("include_auto", value=True)
         ui.update_selectize("strats", selected=DEFAULT_STRATS)
         ui.update_numeric("n", value=DEFAULT_N)
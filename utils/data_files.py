@@ -1,22 +1,82 @@
 """Define config and utility functions for file system interactions."""
 
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections.abc import AsyncIterator
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+from watchfiles import Change, awatch
 
 # Constants for data file names
 DATA_FILENAME = "data.parquet"
 DESC_FILENAME = "desc.parquet"
+META_FILENAME = "meta.json"
+# Parquet row group size (rows), passed through to the pyarrow writer
+PARQUET_ROW_GROUP_SIZE = 65536
 
 # Locate data persistence folder and last updated log file
 DATA_FOLDER = Path(__file__).parent.parent / "data"
 LAST_UPDATED = DATA_FOLDER / "last_updated.txt"
 
 
+def _mtime(path: Path) -> int:
+    # Modification time stamp used as a cache key, or 0 if path is missing
+    return path.stat().st_mtime_ns if path.exists() else 0
+
+
+@functools.lru_cache(maxsize=1)
+def _list_datasets(stamp: tuple[int, int]) -> list:
+    # Cached directory listing, recomputed only when the stamp moves
+    # Directory entries carry their file type, so is_dir() needs no extra stat
+    with os.scandir(DATA_FOLDER) as entries:
+        return sorted(entry.name for entry in entries if entry.is_dir())
+
+
 def get_datasets() -> list:
-    """List available dataset names from data folder."""
-    return sorted([p.name for p in DATA_FOLDER.iterdir() if p.is_dir()])
+    """List available dataset names from data folder.
+
+    The listing is cached on the data folder and last updated log
+    timestamps, so repeated calls (e.g. one per session) share a single
+    directory scan, while dataset folders added or removed by hand are still
+    picked up. The returned list is shared and must not be mutated.
+    """
+    return _list_datasets((_mtime(DATA_FOLDER), _mtime(LAST_UPDATED)))
+
+
+def _is_log_change(change: Change, path: str) -> bool:
+    # Only log writes signal a change, since the log is updated after saves
+    return change != Change.deleted and Path(path) == LAST_UPDATED
+
+
+async def watch_datasets() -> AsyncIterator[None]:
+    """Yield each time the last updated log file is written.
+
+    Waits on native file system notifications (e.g. inotify) rather than
+    polling, so an idle watcher does no work between changes. Only the top
+    level of the data folder is watched, so dataset file writes inside
+    subfolders never wake the watcher.
+    """
+    async for _ in awatch(DATA_FOLDER, watch_filter=_is_log_change, recursive=False):
+        yield
+
+
+@functools.cache
+def init_data_folder() -> None:
+    """Create the data folder and log file on first use in this process.
+
+    Repeat calls return immediately, so this is safe to call per session.
+    An existing log is left alone, so worker restarts do not rewrite it.
+    """
+    DATA_FOLDER.mkdir(parents=True, exist_ok=True)
+    if not LAST_UPDATED.exists():
+        update_log()
 
 
 def update_log() -> None:
@@ -26,33 +86,121 @@ def update_log() -> None:
     if not DATA_FOLDER.exists():
         DATA_FOLDER.mkdir(parents=True, exist_ok=True)
 
-    # Write the current timestamp to the last updated file
-    with open(LAST_UPDATED, "w", encoding="utf-8") as last_updated_file:
-        last_updated_file.write(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    # Write the current timestamp to a temporary file, then swap it in
+    # atomically so readers never see a partially written log
+    # The temporary name is unique per writing process and thread, so
+    # concurrent saves never write to or replace each other's file
+    tmp = DATA_FOLDER / f".{LAST_UPDATED.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp.write_text(datetime.now().strftime("%Y-%m-%d %H:%M:%S"), encoding="utf-8")
+    os.replace(tmp, LAST_UPDATED)
+
 
+def with_string_index(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert a df index to (pyarrow-backed) strings.
 
-def load_data(name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Read data and descriptor files from a specified data directory.
+    String IDs make index lookups match user entered IDs regardless of the
+    original ID column type, and use the Arrow string hash engine.
 
     Args:
-        name: name of the dataset directory to read from
+        df: df to convert
+    Returns:
+        df with a string index
+    """
+
+    return df.set_axis(df.index.astype("str"), axis=0)
+
+
+def _read_parquet(path: Path, columns: list | None = None) -> pd.DataFrame:
+    # Memory-mapped Arrow read converted without keeping a second copy
+    table = pq.read_table(path, columns=columns, memory_map=True, use_pandas_metadata=True)
+    return with_string_index(table.to_pandas(split_blocks=True, self_destruct=True))
+
+
+def build_meta(data: pd.DataFrame) -> dict:
+    """Derive dataset metadata once so it need not be recomputed on load.
+
+    Args:
+        data: original data df
     Returns:
-        tuple of dfs containing original data and calculated descriptors
+        dict of numeric column names, dtype map, row count and content hash
     """
 
-    return (
-        pd.read_parquet(DATA_FOLDER / name / DATA_FILENAME),
-        pd.read_parquet(DATA_FOLDER / name / DESC_FILENAME),
+    content = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    return {
+        "num_cols": data.select_dtypes(include=np.number).columns.tolist(),
+        "dtypes": {str(col): str(dtype) for col, dtype in data.dtypes.items()},
+        "n_rows": int(data.shape[0]),
+        "hash": hashlib.blake2b(content.tobytes(), digest_size=16).hexdigest(),
+    }
+
+
+def _read_meta(path: Path) -> dict | None:
+    # Persisted metadata, or None for datasets saved before it existed
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> None:
+    # zstd decompresses faster than the snappy default
+    df.to_parquet(
+        path,
+        index=True,
+        compression="zstd",
+        use_dictionary=True,
+        row_group_size=PARQUET_ROW_GROUP_SIZE,
     )
 
 
-def save_data(name: str, data: pd.DataFrame, desc: pd.DataFrame) -> None:
-    """Save data and descriptor files to a specified data directory.
+@functools.lru_cache(maxsize=8)
+def _read_data(
+    name: str, stamp: int, numeric_only: bool
+) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    # Cached parquet reads shared across sessions, keyed on folder mtime
+    folder = DATA_FOLDER / name
+    meta = _read_meta(folder / META_FILENAME)
+
+    # Only the numeric data columns are ever plotted, so with metadata at hand
+    # the remaining columns are never read from disk
+    columns = meta["num_cols"] if numeric_only and meta is not None else None
+    data = _read_parquet(folder / DATA_FILENAME, columns)
+    if meta is None:
+        # Fall back to deriving metadata (and the column subset) from a full read
+        meta = build_meta(data)
+        if numeric_only:
+            data = data.loc[:, meta["num_cols"]]
+
+    return data, _read_parquet(folder / DESC_FILENAME), meta
+
+
+def load_data(name: str, numeric_only: bool = False) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """Read data, descriptor and metadata files from a specified data directory.
+
+    Results are cached process-wide, so the returned objects are shared
+    between sessions and must be copied rather than modified in place.
+
+    Args:
+        name: name of the dataset directory to read from
+        numeric_only: read only the numeric data columns (descriptors are
+            always read in full)
+    Returns:
+        tuple of dfs containing original data and calculated descriptors,
+        and the dataset metadata dict (see build_meta)
+    """
+
+    return _read_data(name, _mtime(DATA_FOLDER / name), numeric_only)
+
+
+def save_data(name: str, data: pd.DataFrame, desc: pd.DataFrame) -> dict:
+    """Save data, descriptor and metadata files to a specified data directory.
 
     Args:
         name: dataset name to create directory
         data: original data df
         desc: calculated descriptor df
+    Returns:
+        dict of dataset metadata written alongside the data
     """
 
     # Identify new data directory location and create it
@@ -61,7 +209,14 @@ def save_data(name: str, data: pd.DataFrame, desc: pd.DataFrame) -> None:
     # This will prevent overwriting any existing dataset if validation fails
     save_to_folder.mkdir(parents=True)
 
-    data.to_parquet(save_to_folder / DATA_FILENAME, index=True)
-    desc.to_parquet(save_to_folder / DESC_FILENAME, index=True)
+    _write_parquet(data, save_to_folder / DATA_FILENAME)
+    _write_parquet(desc, save_to_folder / DESC_FILENAME)
+
+    # Derived metadata is written once here rather than recomputed per load
+    meta = build_meta(data)
+    with open(save_to_folder / META_FILENAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
 
     update_log()  # Update the last updated log
+
+    return meta
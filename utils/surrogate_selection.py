@@ -22,6 +22,9 @@ from scipy.spatial.distance import cdist
 from sklearn.cluster import AgglomerativeClustering
 from sklearn.preprocessing import StandardScaler
 
+# Number of surrogates per distance block when scoring random selections
+SCORE_BLOCK_SIZE = 1024
+
 
 class SurrogateSelection:
     """Calculator class for chemical space surrogate selection."""
@@ -46,6 +49,14 @@ class SurrogateSelection:
         self.X = StandardScaler().fit_transform(desc)
         # Calculate leverages for all data points
         self.h = np.diagonal(self.X.dot(np.linalg.inv(self.X.T.dot(self.X)).dot(self.X.T)))
+        # Squared norms of all data points, reused by the batched random scoring
+        self.sq = np.einsum("ij,ij->i", self.X, self.X)
+
+    def _effective_n(self, n: float) -> int:
+        # Calculate "effective" n depending on whether input is < 1
+        X_size = self.X.shape[0]
+        # Ensure n is not larger than dataset size
+        return min(round(n * X_size if n < 1 else n), X_size)
 
     def _lowest_n_leverage(self, n: int) -> np.ndarray:
         return np.argpartition(self.h, n, axis=0)[:n:]
@@ -68,6 +79,24 @@ class SurrogateSelection:
 
         return np.dot(self.h, np.min(cdist(self.X, self.X[s]), axis=1)) / self.X.shape[0]
 
+    def _fast_score(self, s: np.ndarray) -> float:
+        # LARD score via matrix product: |x - y|^2 = |x|^2 + |y|^2 - 2 x.y,
+        # taking the square root only of each point's nearest distance
+        # Surrogates are taken in blocks, bounding the (data x block) temporary
+        nearest = np.full(self.X.shape[0], np.inf)
+        for start in range(0, len(s), SCORE_BLOCK_SIZE):
+            block = s[start : start + SCORE_BLOCK_SIZE]
+            d2 = self.X @ self.X[block].T
+            # In-place updates, no further (data x block) sized temporaries
+            d2 *= -2
+            d2 += self.sq[block]
+            np.minimum(nearest, d2.min(axis=1), out=nearest)
+        nearest += self.sq
+        # A surrogate's distance to itself is only rounding noise here, not 0
+        nearest[s] = 0
+        nearest = np.sqrt(np.maximum(nearest, 0))
+        return np.dot(self.h, nearest) / self.X.shape[0]
+
     def select(
         self, n: float, strategy: "SurrogateSelection.Strategy"
     ) -> tuple[np.ndarray | list, float]:
@@ -80,10 +109,8 @@ class SurrogateSelection:
             tuple of selected surrogate indices and corresponding LARD score
         """
 
-        # Calculate "effective" n depending on whether input is < 1
         X_size = self.X.shape[0]
-        # Ensure n is not larger than dataset size
-        n_eff = min(round(n * X_size if n < 1 else n), X_size)
+        n_eff = self._effective_n(n)
 
         # Select surrogates based on the specified strategy
         match strategy:
@@ -106,3 +133,27 @@ class SurrogateSelection:
 
         # Return surrogate indices and LARD score
         return surrogates, self.score(surrogates)
+
+    def simulate_random(
+        self, n: float, reps: int, seed: int | np.random.SeedSequence | None = None
+    ) -> np.ndarray:
+        """Score repeated random surrogate selections of the same size.
+
+        Each call draws from its own generator, so calls with independent
+        seeds may safely run in parallel threads. Distances are computed via
+        BLAS matrix products (which release the GIL) rather than cdist, so
+        scores may differ from score() by floating point rounding.
+
+        Args:
+            n: number of surrogates or fraction of dataset to select
+            reps: number of random selections to score
+            seed: seed for the random generator
+        Returns:
+            array of LARD scores, one per random selection
+        """
+
+        rng = np.random.default_rng(seed)
+        X_size, n_eff = self.X.shape[0], self._effective_n(n)
+        return np.array(
+            [self._fast_score(rng.choice(X_size, n_eff, replace=False)) for _ in range(reps)]
+        )